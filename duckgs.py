@@ -24,37 +24,69 @@ $ duckgs --examples
 or
 $ duckgs -x
 """
-import hashlib
 import os
 import re
+import sys
+import tempfile
 import time
+import warnings
+from functools import lru_cache
 from pathlib import Path
 from textwrap import dedent
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-import duckdb
-import pandas as pd  # noqa
-import sqlparse
 import typer
-from fsspec import filesystem
 from rich import print, print_json  # noqa
 from rich.console import Console
 from rich.status import Status
-from rich.syntax import Syntax
 from typer import Option
 
+if TYPE_CHECKING:
+    import duckdb
+    import pandas as pd
+    import pyarrow as pa
+
 __all__ = ["print", "print_json", "app"]
 
-TEMP = "/tmp/duckgs"
+# heavy modules (duckdb, pandas, pyarrow, ...) are imported lazily inside
+# the functions that use them so --help/--examples never pay for them
+_LAZY_MODULES = {
+    "duckdb": "duckdb",
+    "pd": "pandas",
+    "pandas": "pandas",
+    "pa": "pyarrow",
+    "pyarrow": "pyarrow",
+    "sqlparse": "sqlparse",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_MODULES:
+        import importlib
+
+        module = importlib.import_module(_LAZY_MODULES[name])
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# prefer tmpfs (XDG_RUNTIME_DIR or /dev/shm) so cache reads/writes never
+# touch a journaled disk; fall back to the regular temp dir otherwise
+TEMP = (
+    os.environ.get("XDG_RUNTIME_DIR")
+    or ("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir())
+) + "/duckgs"
 VERBOSE = False
 
+# skip warnings from DuckDB; set once instead of snapshotting
+# warnings.filters around every registration
+warnings.filterwarnings("ignore", category=Warning)
+
 # Inicializar Typer CLI y Rich
 app = typer.Typer(rich_markup_mode="rich")
 console = Console()
 
 
-def print_examples():
-    out = r"""
+_EXAMPLES = dedent(r"""
         _______  __ ___    __  _______  __    ___________
        / ____/ |/ //   |  /  |/  / __ \/ /   / ____/ ___/
       / __/  |   // /| | / /|_/ / /_/ / /   / __/  \__ \
@@ -110,40 +142,33 @@ def print_examples():
 
     $ duckgs --query-file /tmp/query.sql --eval-df "df.to_csv()" -s > /tmp/out.csv
     $ cat /tmp/out.csv
-    """
-    out = dedent(out)
-    console.print(out)
+    """)
+
+
+def print_examples():
+    console.print(_EXAMPLES)
+
 
+# identifiers only, so DuckDB struct literals like {'a': 1} don't match
+_PLACEHOLDER_RE = re.compile(r'\{([A-Za-z_]\w*)\}')
 
-def find_placeholders(query: str):
-    placeholders = re.findall(r'\{(.+?)\}', query)
-    return placeholders
 
+class _Lazy(dict):
+    """Mapping that prompts the user for any placeholder it is missing."""
 
-def ask_user_for_values(placeholders: list[str]):
-    values = {}
-    for placeholder in placeholders:
+    def __missing__(self, key):
         value = console.input(
-            f"Please provide a value for [bold green]{placeholder}[/]: ",
+            f"Please provide a value for [bold green]{key}[/]: ",
             markup=True,
         )
-        values[placeholder] = value
-    return values
-
+        self[key] = value
+        return value
 
-def fill_placeholders(query: str) -> str:
-    placeholders = find_placeholders(query)
-    kwargs_dict = ask_user_for_values(placeholders)
-    query = format(query, **kwargs_dict)
-    return query
 
-
-def format(string: str, **kwargs):
-    try:
-        out = string.format(**kwargs)
-    except KeyError:
-        out = string
-    return out
+def substitute_placeholders(query: str, kwargs: dict) -> str:
+    """Fill every `{placeholder}` in one scan, prompting for unknowns."""
+    values = _Lazy(kwargs)
+    return _PLACEHOLDER_RE.sub(lambda m: str(values[m.group(1)]), query)
 
 
 def mkdir(path: str):
@@ -151,31 +176,124 @@ def mkdir(path: str):
     p.mkdir(parents=True, exist_ok=True)
 
 
+mkdir(TEMP)
+
+
+def canonicalize_query(query: str) -> str:
+    """Normalize whitespace, comments and keyword case.
+
+    Hashing the canonical form means trivial edits (an extra space, a
+    comment) still hit the same cache entry.
+    """
+    import sqlparse
+
+    return sqlparse.format(
+        query,
+        strip_comments=True,
+        strip_whitespace=True,
+        keyword_case='upper',
+        reindent=False,
+    ).strip()
+
+
+@lru_cache(maxsize=None)
+def raw_query_digest(query: str) -> str:
+    """Digest of the exact query text, without canonicalization."""
+    import blake3
+
+    return blake3.blake3(query.encode('utf-8')).hexdigest(length=16)
+
+
+@lru_cache(maxsize=None)
+def query_digest(query: str) -> str:
+    return raw_query_digest(canonicalize_query(query))
+
+
 def generate_cache_filename(query: str) -> str:
+    return f"{TEMP}/cache_{query_digest(query)}.feather"
+
+
+def legacy_cache_filename(query: str) -> str:
+    # pre-Feather caches were keyed by md5 of the raw query string and
+    # always lived under the then-hardcoded /tmp/duckgs, not TEMP
+    import hashlib
+
     hash_digest = hashlib.md5(query.encode('utf-8')).hexdigest()
-    return f"{TEMP}/cache_{hash_digest}.pkl"
+    return f"/tmp/duckgs/cache_{hash_digest}.pkl"
+
+
+def write_cache_file(table, cache_filename: str) -> None:
+    from pyarrow import feather
+
+    # write-then-rename so a Ctrl-C mid-write can't poison the cache;
+    # the pid suffix keeps concurrent invocations from colliding
+    tmp_filename = f"{cache_filename}.{os.getpid()}.tmp"
+    feather.write_feather(table, tmp_filename, compression="uncompressed")
+    os.replace(tmp_filename, cache_filename)
+    # fsync the directory only: makes the rename durable without
+    # paying for a full-file flush
+    dir_fd = os.open(TEMP, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
 
 
 def cachify(func):
     from functools import wraps
 
-    mkdir(TEMP)
-
     @wraps(func)
     def wrapper(*args, **kwargs):
+        from pyarrow import feather
+
         cache_filename = generate_cache_filename(*args, **kwargs)
-        if os.path.exists(cache_filename):
+        # open directly and catch the miss: one syscall fewer than
+        # exists()+open, and no window for the file to disappear between
+        try:
+            table = feather.read_table(cache_filename, memory_map=True)
+        except FileNotFoundError:
+            pass
+        else:
             if VERBOSE:
                 console.print(
                     f"Loading from cache: {cache_filename}",
                     style="bold yellow",
                 )
-            return pd.read_pickle(cache_filename)
-        df = func(*args, **kwargs)
-        df.to_pickle(cache_filename)
+            return table
+        legacy_filename = legacy_cache_filename(*args, **kwargs)
+        try:
+            fh = open(legacy_filename, 'rb')
+        except FileNotFoundError:
+            pass
+        else:
+            # caches written before the Feather switch
+            import pickle
+
+            import pyarrow as pa
+
+            if VERBOSE:
+                console.print(
+                    f"Loading from cache: {legacy_filename}",
+                    style="bold yellow",
+                )
+            with fh:
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(
+                        fh.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL
+                    )
+                df = pickle.load(fh)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            # upgrade the old cache once so later hits take the
+            # memory-mapped Feather path instead of re-unpickling
+            write_cache_file(table, cache_filename)
+            if VERBOSE:
+                console.print(f"Migrated legacy cache to: {cache_filename}")
+            return table
+        table = func(*args, **kwargs)
+        write_cache_file(table, cache_filename)
         if VERBOSE:
             console.print(f"Query cached: {cache_filename}")
-        return df
+        return table
 
     return wrapper
 
@@ -185,24 +303,100 @@ def read_query_from_file(file_path: str) -> str:
         return file.read().strip()
 
 
+_CONNECTION = None
+_CONNECTION_LOCK = None
+
+
+def get_connection() -> "duckdb.DuckDBPyConnection":
+    """Open (once per process) a durable DuckDB database under TEMP.
+
+    A persistent database file keeps DuckDB's Parquet metadata and object
+    caches warm across CLI runs. An exclusive flock on a sidecar file keeps
+    concurrent invocations from corrupting the database; runs that can't
+    take the lock fall back to an in-memory database instead of waiting.
+    """
+    global _CONNECTION, _CONNECTION_LOCK
+    if _CONNECTION is None:
+        import fcntl
+
+        import duckdb
+
+        database = f"{TEMP}/duckgs.duckdb"
+        _CONNECTION_LOCK = open(f"{TEMP}/duckgs.lock", "w")
+        try:
+            fcntl.flock(_CONNECTION_LOCK, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            if VERBOSE:
+                console.print(
+                    "Database in use by another duckgs run; "
+                    "using an in-memory database",
+                    style="bold yellow",
+                )
+            _CONNECTION_LOCK.close()
+            _CONNECTION_LOCK = None
+            database = ":memory:"
+        con = duckdb.connect(database)
+        con.execute("SET enable_object_cache=true")
+        con.execute("PRAGMA enable_http_metadata_cache=true")
+        con.execute(f"PRAGMA threads={os.cpu_count()}")
+
+        hmac_key = os.environ.get("GOOGLE_HMAC_KEY")
+        hmac_secret = os.environ.get("GOOGLE_HMAC_SECRET")
+        if hmac_key and hmac_secret:
+            # native HTTPFS issues parallel range reads per row group,
+            # unlike gcsfs which serializes through one file handle;
+            # http_keep_alive lives here because it autoloads httpfs
+            con.execute("SET http_keep_alive=true")
+            con.execute(
+                "CREATE OR REPLACE SECRET gcs_sec ("
+                f"TYPE GCS, KEY_ID {_sql_literal(hmac_key)}, "
+                f"SECRET {_sql_literal(hmac_secret)})"
+            )
+        else:
+            from fsspec import filesystem
+
+            con.register_filesystem(filesystem("gs"))
+        _CONNECTION = con
+    return _CONNECTION
+
+
 @cachify
-def duckdb_query(query: str) -> pd.DataFrame:
+def duckdb_query(query: str) -> "pa.Table":
     global query_time
-    import warnings
 
-    with warnings.catch_warnings():
-        # skip warnings from DuckDB
-        warnings.filterwarnings("ignore", category=Warning)
-        duckdb.register_filesystem(filesystem("gs"))
+    con = get_connection()
 
     with Status("Executing query...\n", console=console, spinner="dots2"):
         tick = time.time()
-        df = duckdb.query(query).df()
+        table = con.query(query).to_arrow_table()
         tock = time.time()
         query_time = tock - tick
         if VERBOSE:
             console.print(f"Query took: {query_time:.2f} seconds")
-    return df
+    return table
+
+
+def to_pandas(table: "pa.Table") -> "pd.DataFrame":
+    import pandas as pd
+
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def parse_kwargs(kwargs: str) -> dict:
+    """Parse --kwargs as JSON, falling back to Python-dict syntax.
+
+    Both paths are safe (no code execution), unlike the eval() they
+    replace, and literal parsing is much cheaper than a compile+exec.
+    """
+    import ast
+    import json
+
+    if not kwargs or not kwargs.strip():
+        return {}
+    try:
+        return json.loads(kwargs)
+    except ValueError:
+        return ast.literal_eval(kwargs)
 
 
 def ensure_bucket(bucket: str) -> str:
@@ -216,23 +410,34 @@ def build_query(
     query_file: str,
     kwargs: dict,
 ) -> str:
-    if query:
-        out = format(query, **kwargs)
-    elif query_file:
+    if not query and query_file:
         with open(query_file, 'r') as file:
             query = file.read().strip()
-        out = format(query, **kwargs)
-    else:
+    if not query:
         console.print("Please provide a query or a query file.")
         raise typer.Exit(1)
-    return out
+    return substitute_placeholders(query, kwargs)
 
 
 def print_query(query: str) -> None:
     if VERBOSE:
-        _query = sqlparse.format(
-            query, reindent_aligned=True, keyword_case='upper'
-        )
+        from rich.syntax import Syntax
+
+        # sqlparse is pure-Python and slow on big queries; reuse the
+        # pretty-printed form across runs. Keyed by the raw text (not the
+        # canonical form) so the panel always shows the query as written
+        fmt_filename = f"{TEMP}/fmt_{raw_query_digest(query)}.sql"
+        if os.path.exists(fmt_filename):
+            with open(fmt_filename, 'r') as fh:
+                _query = fh.read()
+        else:
+            import sqlparse
+
+            _query = sqlparse.format(
+                query, reindent_aligned=True, keyword_case='upper'
+            )
+            with open(fmt_filename, 'w') as fh:
+                fh.write(_query)
         _query = Syntax(
             _query,
             "sql",
@@ -253,6 +458,26 @@ def print_query(query: str) -> None:
 
 
 def print_result(out: Any, key="") -> None:
+    if not VERBOSE:
+        # silent mode exists for piping: stream bytes straight to stdout
+        # instead of building one giant string through rich
+        if isinstance(out, str):
+            sys.stdout.buffer.write(out.encode())
+            return
+        if "pyarrow" in sys.modules:
+            import pyarrow as pa
+
+            if isinstance(out, pa.Table):
+                from pyarrow import csv as pa_csv
+
+                pa_csv.write_csv(out, sys.stdout.buffer)
+                return
+        if "pandas" in sys.modules:
+            import pandas as pd
+
+            if isinstance(out, pd.DataFrame):
+                out.to_csv(sys.stdout, index=False)
+                return
     if VERBOSE:
         if key:
             key = f"\\[{key}]"
@@ -267,24 +492,153 @@ def print_result(out: Any, key="") -> None:
     )
 
 
+_PUSHDOWN_OPS = {
+    "Gt": ">",
+    "GtE": ">=",
+    "Lt": "<",
+    "LtE": "<=",
+    "Eq": "=",
+    "NotEq": "!=",
+}
+
+
+def _sql_literal(value) -> str:
+    if isinstance(value, str):
+        escaped = value.replace("'", "''")
+        return f"'{escaped}'"
+    return repr(value)
+
+
+def _pushdown_one(expr: str, query: str):
+    """Rewrite a simple eval-df expression as SQL around `query`.
+
+    Returns the wrapped query, or None when the expression is not one of
+    the recognized patterns (column subset, single comparison, head).
+    """
+    import ast
+
+    try:
+        tree = ast.parse(expr, mode="eval").body
+    except SyntaxError:
+        return None
+
+    # df.head(n) -> LIMIT n
+    if (
+        isinstance(tree, ast.Call)
+        and not tree.keywords
+        and isinstance(tree.func, ast.Attribute)
+        and tree.func.attr == "head"
+        and isinstance(tree.func.value, ast.Name)
+        and tree.func.value.id == "df"
+    ):
+        if not tree.args:
+            n = 5  # pandas default
+        elif (
+            len(tree.args) == 1
+            and isinstance(tree.args[0], ast.Constant)
+            and isinstance(tree.args[0].value, int)
+        ):
+            n = tree.args[0].value
+        else:
+            return None
+        return f"SELECT * FROM ({query}) LIMIT {n}"
+
+    if not (
+        isinstance(tree, ast.Subscript)
+        and isinstance(tree.value, ast.Name)
+        and tree.value.id == "df"
+    ):
+        return None
+    sub = tree.slice
+    if isinstance(sub, ast.Index):  # python < 3.9
+        sub = sub.value
+
+    # df[['a', 'b']] -> SELECT "a", "b"
+    if isinstance(sub, ast.List) and all(
+        isinstance(e, ast.Constant) and isinstance(e.value, str)
+        for e in sub.elts
+    ):
+        cols = ", ".join(f'"{e.value}"' for e in sub.elts)
+        return f"SELECT {cols} FROM ({query})"
+
+    # df[df.col > k] -> WHERE "col" > k
+    if (
+        isinstance(sub, ast.Compare)
+        and len(sub.ops) == 1
+        and isinstance(sub.left, ast.Attribute)
+        and isinstance(sub.left.value, ast.Name)
+        and sub.left.value.id == "df"
+        and type(sub.ops[0]).__name__ in _PUSHDOWN_OPS
+        and isinstance(sub.comparators[0], ast.Constant)
+        and isinstance(sub.comparators[0].value, (int, float, str))
+    ):
+        op = _PUSHDOWN_OPS[type(sub.ops[0]).__name__]
+        value = _sql_literal(sub.comparators[0].value)
+        column = sub.left.attr
+        return f'SELECT * FROM ({query}) WHERE "{column}" {op} {value}'
+    return None
+
+
+def pushdown_eval_df(eval_df: list[str], query: str):
+    """Fold leading --eval-df projections/filters into the SQL itself.
+
+    Filtering in SQL lets DuckDB prune Parquet columns/rows before they
+    cross the network instead of post-filtering the full result in
+    pandas. Expressions that don't match a known pattern (and everything
+    after them) still run in Python.
+    """
+    remaining = list(eval_df)
+    while remaining:
+        rewritten = _pushdown_one(remaining[0], query)
+        if rewritten is None:
+            break
+        if VERBOSE:
+            console.print(
+                f"Pushed down into SQL: {remaining[0]}",
+                style="bold yellow",
+            )
+        query = rewritten
+        remaining.pop(0)
+    return query, remaining
+
+
+@lru_cache(maxsize=None)
+def _compile_eval(expr: str):
+    return compile(expr, "<eval-df>", "eval")
+
+
+@lru_cache(maxsize=None)
+def _compile_script(script: str):
+    import code
+
+    return code.compile_command(script)
+
+
 def run_eval_df(eval_df, query, df):
-    # manipulate result
-    if isinstance(eval_df, list):
-        for code in eval_df:
-            return run_eval_df(code, query, df)
+    import pandas as pd
 
-    df = eval(eval_df)
-    if VERBOSE:
-        console.print("\n[green]In\\[eval-df][/]:\n")
-        console.print(eval_df)
-        console.print("\n[green]Out\\[eval-df]:[/]\n")
-        console.print(df)
+    # manipulate result
+    if not isinstance(eval_df, list):
+        eval_df = [eval_df]
+    for expr in eval_df:
+        df = eval(_compile_eval(expr), {"df": df, "pd": pd, "query": query})
+        if VERBOSE:
+            console.print("\n[green]In\\[eval-df][/]:\n")
+            console.print(expr)
+            console.print("\n[green]Out\\[eval-df]:[/]\n")
+            console.print(df)
     return df
 
 
 def run_script(script, globals, locals):
+    import pandas as pd
+
+    globals.setdefault("pd", pd)
+
     # execute script
     if VERBOSE:
+        from rich.syntax import Syntax
+
         _script = Syntax(
             script,
             "python",
@@ -296,19 +650,23 @@ def run_script(script, globals, locals):
         console.print(_script)
         console.print("\n[green]Out\\[script]:[/]\n")
 
-    import code
-
-    compiled = code.compile_command(script)
+    compiled = _compile_script(script)
     if compiled is not None:
         exec(compiled, globals, locals)
 
 
 def run_script_file(script_file, globals, locals):
+    import pandas as pd
+
+    globals.setdefault("pd", pd)
+
     # execute script
     with open(script_file, 'r') as file:
         script = file.read().strip()
 
     if VERBOSE:
+        from rich.syntax import Syntax
+
         _script = Syntax(
             script,
             "python",
@@ -422,18 +780,22 @@ def cli(
         print_examples()
         raise typer.Exit()
 
-    kwargs_dict = eval(kwargs)
+    kwargs_dict = parse_kwargs(kwargs)
     bucket = ensure_bucket(bucket)
     fmt_kws = {"bucket": bucket}
     fmt_kws.update(kwargs_dict)
 
     query = build_query(query, query_file, fmt_kws)
-    query = fill_placeholders(query)
     query = dedent(query)
+    if eval_df:
+        query, eval_df = pushdown_eval_df(eval_df, query)
     print_query(query)
 
     # result
     df = duckdb_query(query)
+    if eval_df or script or script_file or ipython:
+        # pandas is only needed when the user manipulates `df`
+        df = to_pandas(df)
     if VERBOSE:
         print_result(df, key="query")
 